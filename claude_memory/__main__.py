@@ -25,16 +25,21 @@ Usage:
     python -m claude_memory audit                              # Weekly Memory Audit (7 days vs saved memories via Gemini)
     python -m claude_memory audit --days 3                     # Custom range
     python -m claude_memory audit --dry-run                    # Show stats without calling Gemini
+    python -m claude_memory audit --projects ~/a,~/b           # Audit several projects in one Gemini call
 """
 
+import bisect
 import json
+import os
+import re
 import sys
-import shutil
+import time
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
+from typing import Optional
 
 from claude_memory.memory_db import ClaudeMemoryDB, DB_DIR, DB_PATH
-from claude_memory.brief_generator import generate_brief
 
 
 # Where Claude Code stores its settings and hooks
@@ -103,6 +108,35 @@ When the user says they're done:
 4. Commit and push to git
 """.strip()
 
+# CLAUDE.md files end with a newline — both write sites use this
+_CLAUDE_MD_SNIPPET_NL = CLAUDE_MD_SNIPPET + "\n"
+
+# Fresh session_log.md written by init
+SESSION_LOG_TEMPLATE = (
+    "# Session Log\n*Created: {now}*\n"
+    "*Purpose: Persistent session state — survives context resets*\n\n"
+    "## Recent Sessions (most recent first)\n\nNo sessions recorded yet.\n"
+)
+
+# UserPromptSubmit hook script, written to ~/.claude/context_check.js by init
+CONTEXT_CHECK_JS = """\
+const fs = require('fs');
+const path = require('path');
+
+const pctFile = path.join(process.env.HOME || process.env.USERPROFILE, '.claude', 'context_pct.txt');
+
+try {
+  const pct = parseInt(fs.readFileSync(pctFile, 'utf8').trim(), 10);
+  if (pct >= 80) {
+    console.log(`CONTEXT EMERGENCY (${pct}%): Save immediately — update session_log.md, save memories, regenerate brief, commit and push. Finish only your current task, then let auto-compact handle continuation.`);
+  } else if (pct >= 70) {
+    console.log(`CONTEXT SAVE POINT (${pct}%): Save state now — (1) Update session_log.md with full state, (2) Save memories via python -m claude_memory add, (3) Regenerate brief via python -m claude_memory brief, (4) Commit and push to git. Then keep working — auto-compact will handle continuation when needed.`);
+  }
+} catch (e) {
+  // File doesn't exist or can't be read — no warning needed
+}
+"""
+
 # Statusline command — shows context % at bottom of Claude Code
 # Uses simple chars (=.) that work on all terminals including Windows
 STATUSLINE_COMMAND = (
@@ -119,6 +153,58 @@ STATUSLINE_COMMAND = (
     'else echo "[$bar] ${pct}%"; fi'
 )
 
+# Cached session_index.md entries per transcript dir, keyed by transcript name + mtime + size
+INDEX_CACHE_PATH = DB_DIR / ".session_bullets_cache.json"
+
+# Commands that read or write the memory DB. Everything else (timeline,
+# transcripts, identity, ...) skips opening SQLite entirely.
+DB_COMMANDS = {
+    "brief", "status", "add", "decay", "prune", "search", "save-session",
+    "sessions", "auto-save", "export", "init", "bulletin", "audit",
+}
+
+# (timestamp, text) from a transcript user message — read_transcript always sets both keys
+_TS_AND_TEXT = itemgetter("timestamp", "text")
+
+# Any of these in CLAUDE.md means the memory instructions are already there (one regex pass)
+_CLAUDE_MD_MARKER = re.compile(r"claude_memory|Memory System|Memory Commands")
+
+# Session UUIDs as they appear in session_log.md
+_UUID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+# Date+time headers in session_index.md (e.g. "### 2026-02-17 ~15:30")
+_INDEX_HDR_RE = re.compile(r"###\s+(\d{4}-\d{2}-\d{2})\s+~?(\d{2}:\d{2})")
+
+
+def _slurp(path: Path) -> str:
+    """Read a whole UTF-8 file in one unbuffered read (no BufferedReader/TextIOWrapper)."""
+    with open(path, "rb", buffering=0) as f:
+        return f.read().decode("utf-8")
+
+
+def _fmt_ts(ts: str) -> str:
+    """'2026-02-09T14:03:27.123Z' -> '2026-02-09 14:03:27' ('?' if missing/short)."""
+    # The ISO "T" is always at index 10, so slice around it instead of scanning
+    return f"{ts[:10]} {ts[11:19]}" if ts and len(ts) >= 19 else "?"
+
+
+def _flag_value(flag: str) -> Optional[str]:
+    """
+    Value following `flag` in sys.argv, found in a single scan.
+
+    Returns None if the flag is absent and "" if it is the last argument.
+    """
+    argv = sys.argv
+    for i, arg in enumerate(argv):
+        if arg == flag:
+            return argv[i + 1] if i + 1 < len(argv) else ""
+    return None
+
+
+def _window_end(sessions: list, cutoff: float) -> int:
+    """Index of the first (path, stat) entry older than cutoff in a newest-first listing."""
+    return bisect.bisect_right(sessions, -cutoff, key=lambda e: -e[1].st_mtime)
+
 
 def main():
     if len(sys.argv) < 2:
@@ -126,18 +212,16 @@ def main():
         return
 
     command = sys.argv[1]
-    db = ClaudeMemoryDB()
+    db = ClaudeMemoryDB() if command in DB_COMMANDS else None
 
     if command == "brief":
-        # Check for --project flag
+        # Check for --project flag (bare --project means the current directory)
         project_path = None
-        if "--project" in sys.argv:
-            idx = sys.argv.index("--project")
-            if idx + 1 < len(sys.argv):
-                project_path = Path(sys.argv[idx + 1]).resolve()
-            else:
-                project_path = Path.cwd()
+        project_arg = _flag_value("--project")
+        if project_arg is not None:
+            project_path = Path(project_arg).resolve() if project_arg else Path.cwd()
 
+        from claude_memory.brief_generator import generate_brief
         path = generate_brief(db, project_path=project_path)
         stats = db.get_stats()
         print(f"Brief generated: {path}")
@@ -163,8 +247,8 @@ def main():
             print(f"  {cat}: {count}")
 
         # Show session info
-        sessions = db.get_sessions(limit=50)
-        print(f"\nSaved sessions:     {len(sessions)}")
+        print(f"\nSaved sessions:     {db.count_sessions()}")
+        sessions = db.get_sessions(limit=1)
         if sessions:
             latest = sessions[0]
             ts = latest["created_at"][:16].replace("T", " ")
@@ -249,7 +333,7 @@ def main():
 
         summary = " ".join(summary_parts)
         session_id = db.save_session(summary, project=project, files_changed=files_changed)
-        total = len(db.get_sessions(limit=50))
+        total = db.count_sessions()
         print(f"Session #{session_id} saved ({total} sessions stored)")
         print(f"  {summary[:200]}")
 
@@ -315,16 +399,15 @@ def main():
                 print()
 
     elif command == "audit":
-        from claude_memory.audit import run_audit
-        days = 7
-        dry_run = False
-        if "--days" in sys.argv:
-            idx = sys.argv.index("--days")
-            if idx + 1 < len(sys.argv):
-                days = int(sys.argv[idx + 1])
-        if "--dry-run" in sys.argv:
-            dry_run = True
-        run_audit(db, days=days, dry_run=dry_run)
+        from claude_memory.audit import run_audit, run_audit_batch
+        days = int(_flag_value("--days") or 7)
+        dry_run = "--dry-run" in sys.argv
+        projects = _flag_value("--projects")
+        if projects:
+            project_dirs = [str(Path(p).expanduser().resolve()) for p in projects.split(",") if p]
+            run_audit_batch(db, project_dirs, days=days, dry_run=dry_run)
+        else:
+            run_audit(db, days=days, dry_run=dry_run)
 
     elif command == "identity":
         from claude_memory.bulletin import get_identity
@@ -354,10 +437,14 @@ def _show_timeline():
 
     The human exchanged TIME for this work. If hours are unaccounted for,
     something was forgotten. Flag it loudly.
+
+    When stdout is not a terminal (pipes, hooks, Claude's own Bash tool), each
+    session is a single tab-separated row instead of the bar chart.
     """
-    from claude_memory.transcript_reader import list_sessions, read_transcript
+    tty = sys.stdout.isatty()
+    from claude_memory.transcript_reader import list_session_stats, read_transcript
 
-    sessions = list_sessions(limit=50)
+    sessions = list_session_stats(limit=50)
     if not sessions:
         print("No session transcripts found.")
         return
@@ -365,27 +452,22 @@ def _show_timeline():
     cutoff = datetime.now().timestamp() - (48 * 3600)
 
     # Read session_log.md AND session_index.md to find which sessions are logged
-    logged_ids = set()
-    logged_timestamps = set()  # HH:MM timestamps from index headers
-    import re
-    for log_name in ("session_log.md", "session_index.md"):
-        log_path = Path.cwd() / log_name
-        if log_path.exists():
-            log_text = log_path.read_text(encoding="utf-8")
-            # Match full UUIDs in session_log.md
-            for match in re.finditer(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", log_text):
-                logged_ids.add(match.group(0))
-            # Match date+time headers in session_index.md (e.g. "### 2026-02-17 ~15:30")
-            for match in re.finditer(r"###\s+(\d{4}-\d{2}-\d{2})\s+~?(\d{2}:\d{2})", log_text):
-                logged_timestamps.add(f"{match.group(1)} {match.group(2)}")
+    log_paths = (Path.cwd() / "session_log.md", Path.cwd() / "session_index.md")
+    log_text = "\n".join(_slurp(p) for p in log_paths if p.exists())
+    # Match full UUIDs in session_log.md
+    logged_ids = set(_UUID_RE.findall(log_text))
+    # Match date+time headers in session_index.md, expanded to every (date, hour)
+    # within 2 hours of the header — makes the proximity check an O(1) lookup
+    logged_hour_buckets = {
+        (ldate, h)
+        for ldate, lhour in ((d, int(t[:2])) for d, t in _INDEX_HDR_RE.findall(log_text))
+        for h in range(lhour - 2, lhour + 3)
+    }
 
     # Collect sessions within 48h window
     recent = []
-    for session_path in sessions:
-        mtime = session_path.stat().st_mtime
-        if mtime < cutoff:
-            continue
-        t = read_transcript(session_path)
+    for session_path, st in sessions[:_window_end(sessions, cutoff)]:
+        t = read_transcript(session_path, st)
         if t.user_message_count < 1:
             continue
         recent.append(t)
@@ -408,6 +490,7 @@ def _show_timeline():
     print()
 
     unlogged = []
+    out = []  # One write at the end — many small prints are slow on Windows consoles
     for t in recent:
         sid = t.session_id
         start = t.started_at[:16].replace("T", " ") if t.started_at else "?"
@@ -416,19 +499,10 @@ def _show_timeline():
         msgs = t.user_message_count
         # Check if logged by UUID or by timestamp proximity (within 2 hours)
         is_logged = sid in logged_ids
-        if not is_logged and t.started_at:
-            try:
-                sess_dt = datetime.fromisoformat(t.started_at.replace("Z", "+00:00"))
-                sess_date = sess_dt.strftime("%Y-%m-%d")
-                sess_hour = sess_dt.hour
-                for lts in logged_timestamps:
-                    ldate, ltime = lts.split(" ")
-                    lhour = int(ltime.split(":")[0])
-                    if ldate == sess_date and abs(lhour - sess_hour) <= 2:
-                        is_logged = True
-                        break
-            except (ValueError, TypeError):
-                pass
+        if not is_logged and t.started_at_epoch is not None:
+            sess_tm = time.gmtime(t.started_at_epoch)
+            sess_date = f"{sess_tm.tm_year:04d}-{sess_tm.tm_mon:02d}-{sess_tm.tm_mday:02d}"
+            is_logged = (sess_date, sess_tm.tm_hour) in logged_hour_buckets
 
         # Duration display
         if dur >= 60:
@@ -446,21 +520,23 @@ def _show_timeline():
             unlogged.append(t)
 
         # First user message as context
-        first_msg = ""
-        for msg in t.user_messages:
-            text = msg.get("text", "").strip()
-            if text and not text.startswith("{") and not text.startswith("<"):
-                first_msg = text[:60]
-                break
+        first_msg = t.first_meaningful[:60]
+
+        if not tty:
+            first_line = first_msg.partition("\n")[0]
+            out.append(f"{sid[:8]}\t{start}\t{dur_str}\t{status.strip()}\t{first_line}\n")
+            continue
 
         # The timeline bar — width proportional to duration (1 char = 10 min, max 30)
         bar_len = min(int(dur / 10), 30) if dur > 0 else 0
         bar = "#" * max(bar_len, 1)
 
-        print(f"  {start}  [{status}] {bar:<30s}  {dur_str:>5s}  {sid[:8]}")
+        out.append(f"  {start}  [{status}] {bar:<30s}  {dur_str:>5s}  {sid[:8]}\n")
         if first_msg:
-            print(f"                          {first_msg}")
-        print()
+            out.append(f"                          {first_msg}\n")
+        out.append("\n")
+
+    sys.stdout.write("".join(out))
 
     # Summary
     print("-" * 70)
@@ -483,11 +559,8 @@ def _show_timeline():
             start = t.started_at[:16].replace("T", " ") if t.started_at else "?"
             print(f"    {t.session_id[:8]}  {start}  {dur_str}  ({t.user_message_count} messages)")
             # Show first meaningful user message
-            for msg in t.user_messages[:3]:
-                text = msg.get("text", "").strip()
-                if text and not text.startswith("{") and not text.startswith("<"):
-                    print(f"      > {text[:100]}")
-                    break
+            if t.first_meaningful:
+                print(f"      > {t.first_meaningful[:100]}")
         print()
         print("  ACTION: Read these sessions and update session_log.md")
         print("!" * 70)
@@ -498,17 +571,7 @@ def _show_timeline():
     hook_error_log = Path.home() / ".claude" / "hook_errors.log"
     if hook_error_log.exists():
         try:
-            errors = hook_error_log.read_text(encoding="utf-8").strip().splitlines()
-            # Filter to errors within 48h window
-            recent_errors = []
-            for line in errors:
-                try:
-                    err_ts = line.split(" ")[0]
-                    err_dt = datetime.fromisoformat(err_ts.replace("Z", "+00:00"))
-                    if err_dt.timestamp() > cutoff:
-                        recent_errors.append(line)
-                except (ValueError, IndexError):
-                    pass
+            recent_errors = _recent_hook_errors(hook_error_log, cutoff)
             if recent_errors:
                 print()
                 print("~" * 70)
@@ -525,6 +588,41 @@ def _show_timeline():
     print()
 
 
+def _recent_hook_errors(log_path: Path, cutoff: float, block_size: int = 65536) -> list[str]:
+    """
+    Return hook error lines newer than cutoff, oldest first.
+
+    The log is append-only and chronological, so it is read backwards in
+    blocks and the scan stops at the first entry older than the window —
+    old history is never read.
+    """
+    recent = []
+    with open(log_path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        partial = b""
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + partial).split(b"\n")
+            # The first piece may be cut mid-line unless we reached the start of the file
+            partial = lines.pop(0) if pos > 0 else b""
+            for raw in reversed(lines):
+                line = raw.decode("utf-8").rstrip()
+                if not line:
+                    continue
+                try:
+                    err_dt = datetime.fromisoformat(line.partition(" ")[0].replace("Z", "+00:00"))
+                except ValueError:
+                    continue
+                if err_dt.timestamp() <= cutoff:
+                    recent.reverse()
+                    return recent
+                recent.append(line)
+    recent.reverse()
+    return recent
+
+
 def _build_session_index(days: int = 30):
     """
     Build session_index.md — a bullet-point summary of all sessions from the last N days.
@@ -536,62 +634,100 @@ def _build_session_index(days: int = 30):
     Args:
         days: How many days of sessions to index (default: 30)
     """
-    from claude_memory.transcript_reader import list_sessions, read_transcript
+    from claude_memory.transcript_reader import list_session_stats, read_transcript
 
-    sessions = list_sessions(limit=200)  # Get all available sessions
+    sessions = list_session_stats(limit=200)  # Get all available sessions
     if not sessions:
         print("No session transcripts found.")
         return
 
     cutoff = datetime.now().timestamp() - (days * 86400)
 
-    lines = [
-        "# Session Index (30 days)",
-        f"*Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}*",
-        "*Bullet summaries of recent sessions. Full transcripts searchable via jq.*",
-        "",
-    ]
+    # Sessions are newest first, so everything past the cutoff boundary is older
+    in_window = sessions[:_window_end(sessions, cutoff)]
 
+    index_path = Path.cwd() / "session_index.md"
     indexed_count = 0
-    for session_path in reversed(sessions):  # oldest first for chronological order
-        # Skip sessions older than cutoff
-        mtime = session_path.stat().st_mtime
-        if mtime < cutoff:
-            continue
+    line_count = 4  # header + blank line
+
+    # Transcripts are immutable once written, so unchanged files reuse their cached entry.
+    # The cache file is shared by all projects; only this transcript dir's section is rebuilt
+    cache = _load_index_cache()
+    transcript_dir = str(sessions[0][0].parent)
+    cached = cache.get(transcript_dir, {})
+    fresh_cache = {}
+
+    # Stream entries straight to disk; the 1MB buffer absorbs the small writes
+    with open(index_path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        f.write(
+            "# Session Index (30 days)\n"
+            f"*Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}*\n"
+            "*Bullet summaries of recent sessions. Full transcripts searchable via jq.*\n"
+        )
 
-        transcript = read_transcript(session_path)
+        for session_path, st in reversed(in_window):  # oldest first for chronological order
+            key = f"{session_path.name}:{st.st_mtime}:{st.st_size}"
+            entry_lines = cached.get(key)
+            if entry_lines is None:
+                transcript = read_transcript(session_path, st)
+                # Skip tiny sessions (just startup reads) — cached as an empty entry
+                entry_lines = _index_entry_lines(transcript) if transcript.user_message_count >= 2 else []
+            fresh_cache[key] = entry_lines
 
-        # Skip tiny sessions (just startup reads)
-        if transcript.user_message_count < 2:
-            continue
+            if not entry_lines:
+                continue
 
-        indexed_count += 1
+            indexed_count += 1
 
-        # Build entry header
-        ts = transcript.started_at[:16].replace("T", " ") if transcript.started_at else "unknown"
-        dur = f" ({transcript.duration_minutes:.0f} min)" if transcript.duration_minutes else ""
-        size_kb = transcript.file_size // 1024
+            # Each entry is preceded by the blank line that separates entries
+            f.write("\n")
+            for line in entry_lines:
+                f.write(line + "\n")
+            line_count += len(entry_lines) + 1
 
-        lines.append(f"### {ts}{dur} — {size_kb}KB")
+    # Only sessions still in the window are kept, so no section outgrows its index
+    cache[transcript_dir] = fresh_cache
+    _save_index_cache(cache)
 
-        # Extract bullet points from user messages (first 8 messages, deduplicated themes)
-        bullets = _extract_session_bullets(transcript)
-        for bullet in bullets:
-            lines.append(f"- {bullet}")
+    print(f"Session index built: {index_path}")
+    print(f"  {indexed_count} sessions indexed ({line_count} lines)")
+    print(f"  Covering last {days} days")
 
-        if transcript.files_changed:
-            files_str = ", ".join(transcript.files_changed[:8])
-            lines.append(f"- *Files: {files_str}*")
 
-        lines.append("")
+def _load_index_cache() -> dict:
+    """Load cached session_index entries ({"<transcript dir>": {"<name>:<mtime>:<size>": [lines]}})."""
+    try:
+        return json.loads(_slurp(INDEX_CACHE_PATH))
+    except (OSError, ValueError):
+        return {}
 
-    index_path = Path.cwd() / "session_index.md"
-    index_path.write_text("\n".join(lines), encoding="utf-8")
 
-    line_count = len(lines)
-    print(f"Session index built: {index_path}")
-    print(f"  {indexed_count} sessions indexed ({line_count} lines)")
-    print(f"  Covering last {days} days")
+def _save_index_cache(cache: dict):
+    """Write the session_index entry cache back in one pass."""
+    try:
+        INDEX_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        INDEX_CACHE_PATH.write_text(json.dumps(cache), encoding="utf-8")
+    except OSError:
+        pass
+
+
+def _index_entry_lines(transcript) -> list[str]:
+    """Build the session_index.md entry for one transcript (header, bullets, files)."""
+    ts = transcript.started_at[:16].replace("T", " ") if transcript.started_at else "unknown"
+    dur = f" ({transcript.duration_minutes:.0f} min)" if transcript.duration_minutes else ""
+    size_kb = transcript.file_size // 1024
+
+    lines = [f"### {ts}{dur} — {size_kb}KB"]
+
+    # Extract bullet points from user messages (first 12 messages, deduplicated themes)
+    for bullet in _extract_session_bullets(transcript):
+        lines.append(f"- {bullet}")
+
+    if transcript.files_changed:
+        files_str = ", ".join(transcript.files_changed[:8])
+        lines.append(f"- *Files: {files_str}*")
+
+    return lines
 
 
 def _extract_session_bullets(transcript) -> list[str]:
@@ -635,30 +771,12 @@ def _append_to_session_index(transcript):
     index_path = Path.cwd() / "session_index.md"
 
     # Build entry
-    ts = transcript.started_at[:16].replace("T", " ") if transcript.started_at else "unknown"
-    dur = f" ({transcript.duration_minutes:.0f} min)" if transcript.duration_minutes else ""
-    size_kb = transcript.file_size // 1024
-
-    entry_lines = [
-        f"### {ts}{dur} — {size_kb}KB",
-    ]
-
-    bullets = _extract_session_bullets(transcript)
-    for bullet in bullets:
-        entry_lines.append(f"- {bullet}")
-
-    if transcript.files_changed:
-        files_str = ", ".join(transcript.files_changed[:8])
-        entry_lines.append(f"- *Files: {files_str}*")
-
-    entry_lines.append("")
-    entry = "\n".join(entry_lines)
+    entry = "\n".join(_index_entry_lines(transcript)) + "\n"
 
     if index_path.exists():
-        # Append to existing index
-        content = index_path.read_text(encoding="utf-8")
-        content = content.rstrip() + "\n\n" + entry
-        index_path.write_text(content, encoding="utf-8")
+        # Append to existing index (entries end with a newline, so one more gives a blank separator)
+        with index_path.open("a", encoding="utf-8") as f:
+            f.write("\n" + entry)
     else:
         # Create new index with header
         header = [
@@ -676,13 +794,8 @@ def _show_transcripts():
     from claude_memory.transcript_reader import read_recent_sessions
 
     short_only = "--short" in sys.argv
-    limit = 5
-
     # Check for --limit flag
-    if "--limit" in sys.argv:
-        idx = sys.argv.index("--limit")
-        if idx + 1 < len(sys.argv):
-            limit = int(sys.argv[idx + 1])
+    limit = int(_flag_value("--limit") or 5)
 
     transcripts = read_recent_sessions(limit=limit, short_only=short_only)
 
@@ -709,29 +822,23 @@ def _auto_save(db: ClaudeMemoryDB):
     from claude_memory.transcript_reader import read_transcript, list_sessions
 
     # Try to get transcript path from stdin (hook input is JSON)
-    transcript_path = None
-    session_id = None
     try:
-        hook_input = sys.stdin.read()
-        if hook_input.strip():
-            data = json.loads(hook_input)
-            transcript_path = data.get("transcript_path")
-            session_id = data.get("session_id")
-    except (json.JSONDecodeError, OSError):
-        pass
+        data = json.load(sys.stdin)
+    except (OSError, ValueError):  # ValueError covers JSONDecodeError and empty input
+        data = None
 
-    # Fallback: use the most recent transcript
-    if not transcript_path or not Path(transcript_path).exists():
+    tp = data.get("transcript_path") if isinstance(data, dict) else None
+    if tp and os.path.exists(tp):
+        transcript_path = Path(tp)
+    else:
+        # Fallback: use the most recent transcript
         recent = list_sessions(limit=1)
-        if recent:
-            transcript_path = str(recent[0])
-            session_id = recent[0].stem
-
-    if not transcript_path or not Path(transcript_path).exists():
-        return
+        if not recent:
+            return
+        transcript_path = recent[0]
 
     # Parse the transcript
-    transcript = read_transcript(Path(transcript_path))
+    transcript = read_transcript(transcript_path)
 
     # Skip tiny sessions (just startup reads, no real work)
     if transcript.user_message_count < 2:
@@ -761,15 +868,13 @@ def _auto_save(db: ClaudeMemoryDB):
 
 def _write_session_log(transcript):
     """Write session_log.md with timestamped session data."""
-    from claude_memory.transcript_reader import SessionTranscript
-
     session_log = Path.cwd() / "session_log.md"
 
     # Read existing content to preserve recent sessions
     prev_sessions = ""
     if session_log.exists():
-        content = session_log.read_text(encoding="utf-8")
-        lines = content.split("\n")
+        # _slurp() does no newline translation, so fold CRLF by hand
+        lines = _slurp(session_log).replace("\r\n", "\n").split("\n")
         collecting = False
         prev_lines = []
         session_count = 0
@@ -785,43 +890,43 @@ def _write_session_log(transcript):
 
     # Build new session entry
     now = datetime.now().strftime("%Y-%m-%d %H:%M")
-    started = transcript.started_at[:19].replace("T", " ") if transcript.started_at else "?"
-    ended = transcript.ended_at[:19].replace("T", " ") if transcript.ended_at else "?"
+    started = _fmt_ts(transcript.started_at)
+    ended = _fmt_ts(transcript.ended_at)
     duration = f" ({transcript.duration_minutes:.0f} min)" if transcript.duration_minutes else ""
     size_kb = transcript.file_size // 1024
 
-    out = [
-        "# Session Log",
-        f"*Auto-saved: {now}*",
-        "*Purpose: Persistent session state — survives context resets*",
-        "",
-        "## Recent Sessions (most recent first)",
-        "",
-        f"### Session: {now}",
-        f"*ID: {transcript.session_id}*",
-        f"*Started: {started} | Ended: {ended}{duration}*",
-        f"*Size: {size_kb}KB | Messages: {transcript.user_message_count} user, {transcript.assistant_message_count} assistant*",
-        "",
-        "**What was discussed:**",
-    ]
-
-    for msg in transcript.user_messages[:20]:
-        ts = msg["timestamp"][:19].replace("T", " ") if msg.get("timestamp") else "?"
-        text = msg["text"][:300]
-        out.append(f"- [{ts}] {text}")
+    header = (
+        "# Session Log\n"
+        f"*Auto-saved: {now}*\n"
+        "*Purpose: Persistent session state — survives context resets*\n"
+        "\n"
+        "## Recent Sessions (most recent first)\n"
+        "\n"
+        f"### Session: {now}\n"
+        f"*ID: {transcript.session_id}*\n"
+        f"*Started: {started} | Ended: {ended}{duration}*\n"
+        f"*Size: {size_kb}KB | Messages: {transcript.user_message_count} user, "
+        f"{transcript.assistant_message_count} assistant*\n"
+        "\n"
+        "**What was discussed:**\n"
+    )
 
-    out.append("")
+    # prev_sessions is already in memory, so the file can be streamed straight out
+    with open(session_log, "w", encoding="utf-8") as f:
+        write = f.write
+        write(header)
 
-    if transcript.files_changed:
-        out.append("**Files changed:**")
-        for f in transcript.files_changed[:15]:
-            out.append(f"- {f}")
-        out.append("")
+        for ts, text in map(_TS_AND_TEXT, transcript.user_messages[:20]):
+            write(f"- [{_fmt_ts(ts)}] {text[:300]}\n")
 
-    if prev_sessions:
-        out.append(prev_sessions)
+        if transcript.files_changed:
+            write("\n**Files changed:**\n")
+            for path in transcript.files_changed[:15]:
+                write(f"- {path}\n")
 
-    session_log.write_text("\n".join(out), encoding="utf-8")
+        if prev_sessions:
+            write("\n")
+            write(prev_sessions)
 
 
 def _init_project(db: ClaudeMemoryDB = None):
@@ -846,13 +951,14 @@ def _init_project(db: ClaudeMemoryDB = None):
 
     # --- 1. Database ---
     stats = db.get_stats()
-    mem_count = stats.get("total_memories", 0)
+    mem_count = stats["total"]
     if mem_count > 0:
         print(f"  [1/7] Database: {DB_PATH} ({mem_count} existing memories — KEEPING INTACT)")
     else:
         print(f"  [1/7] Database: {DB_PATH} (fresh)")
 
     # --- 2. Brief ---
+    from claude_memory.brief_generator import generate_brief
     generate_brief(db, project_path=cwd)
     print(f"  [2/7] Brief: {cwd / 'claude_brief.md'}")
 
@@ -860,40 +966,40 @@ def _init_project(db: ClaudeMemoryDB = None):
     claude_md = cwd / "CLAUDE.md"
     if claude_md.exists():
         existing = claude_md.read_text(encoding="utf-8")
-        if "claude_memory" in existing or "Memory System" in existing:
+        if _CLAUDE_MD_MARKER.search(existing):
             print(f"  [3/7] CLAUDE.md already has memory instructions — skipping")
         else:
             with open(claude_md, "a", encoding="utf-8") as f:
-                f.write("\n\n" + CLAUDE_MD_SNIPPET + "\n")
+                f.write("\n\n" + _CLAUDE_MD_SNIPPET_NL)
             print(f"  [3/7] CLAUDE.md updated")
     else:
-        claude_md.write_text(CLAUDE_MD_SNIPPET + "\n", encoding="utf-8")
+        claude_md.write_text(_CLAUDE_MD_SNIPPET_NL, encoding="utf-8")
         print(f"  [3/7] CLAUDE.md created")
 
-    # --- 4. Install hooks ---
-    _install_hooks()
+    # --- 4 + 5. Hooks and statusline (one read and one write of settings.json) ---
+    settings = _load_settings()
+    before = json.dumps(settings, sort_keys=True)
+    _install_hooks(settings)
     print(f"  [4/7] Hooks installed (SessionEnd + context check)")
 
-    # --- 5. Statusline ---
-    _install_statusline()
+    _install_statusline(settings)
+    # Re-running init on a configured machine leaves settings.json untouched
+    if json.dumps(settings, sort_keys=True) != before:
+        _save_settings(settings)
     print(f"  [5/7] Statusline installed (context meter)")
 
     # --- 6. .gitignore ---
     gitignore = cwd / ".gitignore"
     if gitignore.exists():
         content = gitignore.read_text(encoding="utf-8")
-        additions = []
-        if "claude_brief.md" not in content:
-            additions.append("claude_brief.md")
-        if "session_log.md" not in content:
-            additions.append("session_log.md")
-        if "session_index.md" not in content:
-            additions.append("session_index.md")
+        additions = [
+            name for name in ("claude_brief.md", "session_log.md", "session_index.md")
+            if name not in content
+        ]
         if additions:
+            # Append (not rewrite) in a single write call
             with open(gitignore, "a", encoding="utf-8") as f:
-                f.write("\n# Claude Memory\n")
-                for item in additions:
-                    f.write(f"{item}\n")
+                f.write("\n# Claude Memory\n" + "".join(f"{item}\n" for item in additions))
             print(f"  [6/7] .gitignore updated")
         else:
             print(f"  [6/7] .gitignore already configured")
@@ -902,17 +1008,18 @@ def _init_project(db: ClaudeMemoryDB = None):
 
     # --- 7. session_log.md ---
     session_log = cwd / "session_log.md"
-    if not session_log.exists():
-        now = datetime.now().strftime("%Y-%m-%d %H:%M")
-        session_log.write_text(
-            f"# Session Log\n*Created: {now}*\n"
-            f"*Purpose: Persistent session state — survives context resets*\n\n"
-            f"## Recent Sessions (most recent first)\n\nNo sessions recorded yet.\n",
-            encoding="utf-8"
-        )
-        print(f"  [7/7] session_log.md created")
-    else:
+    try:
+        # O_EXCL makes exists-check + create atomic (a SessionEnd hook may race us)
+        fd = os.open(session_log, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o644)
+    except FileExistsError:
         print(f"  [7/7] session_log.md already exists")
+    else:
+        try:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M")
+            os.write(fd, SESSION_LOG_TEMPLATE.format(now=now).encode("utf-8"))
+        finally:
+            os.close(fd)
+        print(f"  [7/7] session_log.md created")
 
     print()
     print("Done! Claude Code now has:")
@@ -928,33 +1035,68 @@ def _init_project(db: ClaudeMemoryDB = None):
     print("Restart Claude Code to activate the statusline and hooks.")
 
 
-def _install_hooks():
-    """Install SessionEnd and UserPromptSubmit hooks into ~/.claude/settings.json."""
-    settings_path = CLAUDE_DIR / "settings.json"
+def _settings_codec():
+    """(loads, dump) for settings.json — orjson if installed, else stdlib json.
 
-    settings = {}
+    dump(obj, f) writes to an open text file, so the stdlib path streams
+    instead of building the whole document as one string first.
+    """
+    try:
+        import orjson
+    except ImportError:
+        return json.loads, lambda obj, f: json.dump(obj, f, indent=2, ensure_ascii=False)
+    return orjson.loads, lambda obj, f: f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8"))
+
+
+def _load_settings() -> dict:
+    """Read ~/.claude/settings.json (empty dict if missing or unparseable)."""
+    settings_path = CLAUDE_DIR / "settings.json"
     if settings_path.exists():
+        loads, _ = _settings_codec()
         try:
-            settings = json.loads(settings_path.read_text(encoding="utf-8"))
-        except json.JSONDecodeError:
-            settings = {}
+            # Both parsers take raw bytes, skipping a separate decode
+            return loads(settings_path.read_bytes())
+        except ValueError:  # json.JSONDecodeError / orjson.JSONDecodeError
+            pass
+    return {}
 
+
+def _save_settings(settings: dict):
+    """Write ~/.claude/settings.json (via a temp file, so a failed write never truncates it)."""
+    _, dump = _settings_codec()
+    settings_path = CLAUDE_DIR / "settings.json"
+    settings_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = settings_path.with_name(f".settings.json.{os.getpid()}.tmp")
+    try:
+        with tmp_path.open("w", encoding="utf-8") as f:
+            dump(settings, f)
+            f.write("\n")
+        os.replace(tmp_path, settings_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _install_hooks(settings: dict):
+    """Add SessionEnd and UserPromptSubmit hooks to the parsed settings (in place)."""
     if "hooks" not in settings:
         settings["hooks"] = {}
 
     hooks = settings["hooks"]
-
-    # SessionEnd hook — auto-save on exit
-    session_end_cmd = "python -m claude_memory auto-save"
     if "SessionEnd" not in hooks:
         hooks["SessionEnd"] = []
+    if "UserPromptSubmit" not in hooks:
+        hooks["UserPromptSubmit"] = []
 
-    se_installed = any(
-        h.get("command", "") == session_end_cmd
-        for entry in hooks["SessionEnd"]
-        for h in entry.get("hooks", [])
-    )
-    if not se_installed:
+    # Commands already registered, per hook event — one pass over each section
+    installed = {
+        event: {h.get("command", "") for entry in hooks[event] for h in entry.get("hooks", [])}
+        for event in ("SessionEnd", "UserPromptSubmit")
+    }
+
+    # SessionEnd hook — auto-save on exit
+    session_end_cmd = "python -m claude_memory auto-save"
+    if session_end_cmd not in installed["SessionEnd"]:
         hooks["SessionEnd"].append({
             "matcher": "",
             "hooks": [{"type": "command", "command": session_end_cmd}]
@@ -965,63 +1107,25 @@ def _install_hooks():
     context_cmd_node = f"node {context_check_dst}"
     # Also accept legacy bash command as already-installed
     context_cmd_bash = "bash ~/.claude/context_check.sh"
-    if "UserPromptSubmit" not in hooks:
-        hooks["UserPromptSubmit"] = []
-
-    ups_installed = any(
-        h.get("command", "") in (context_cmd_node, context_cmd_bash)
-        for entry in hooks["UserPromptSubmit"]
-        for h in entry.get("hooks", [])
-    )
-    if not ups_installed:
+    if installed["UserPromptSubmit"].isdisjoint((context_cmd_node, context_cmd_bash)):
         hooks["UserPromptSubmit"].append({
             "matcher": "",
             "hooks": [{"type": "command", "command": context_cmd_node}]
         })
 
     # Write context_check.js (embedded — no external file dependency)
-    context_check_js = """\
-const fs = require('fs');
-const path = require('path');
-
-const pctFile = path.join(process.env.HOME || process.env.USERPROFILE, '.claude', 'context_pct.txt');
-
-try {
-  const pct = parseInt(fs.readFileSync(pctFile, 'utf8').trim(), 10);
-  if (pct >= 80) {
-    console.log(`CONTEXT EMERGENCY (${pct}%): Save immediately — update session_log.md, save memories, regenerate brief, commit and push. Finish only your current task, then let auto-compact handle continuation.`);
-  } else if (pct >= 70) {
-    console.log(`CONTEXT SAVE POINT (${pct}%): Save state now — (1) Update session_log.md with full state, (2) Save memories via python -m claude_memory add, (3) Regenerate brief via python -m claude_memory brief, (4) Commit and push to git. Then keep working — auto-compact will handle continuation when needed.`);
-  }
-} catch (e) {
-  // File doesn't exist or can't be read — no warning needed
-}
-"""
     if not context_check_dst.exists():
-        context_check_dst.write_text(context_check_js, encoding="utf-8")
+        context_check_dst.parent.mkdir(parents=True, exist_ok=True)
+        context_check_dst.write_text(CONTEXT_CHECK_JS, encoding="utf-8")
 
-    settings_path.parent.mkdir(parents=True, exist_ok=True)
-    settings_path.write_text(json.dumps(settings, indent=2) + "\n", encoding="utf-8")
-
-
-def _install_statusline():
-    """Install the context percentage statusline into settings.json."""
-    settings_path = CLAUDE_DIR / "settings.json"
-
-    settings = {}
-    if settings_path.exists():
-        try:
-            settings = json.loads(settings_path.read_text(encoding="utf-8"))
-        except json.JSONDecodeError:
-            settings = {}
 
+def _install_statusline(settings: dict):
+    """Set the context percentage statusline in the parsed settings (in place)."""
     settings["statusLine"] = {
         "type": "command",
         "command": STATUSLINE_COMMAND
     }
 
-    settings_path.write_text(json.dumps(settings, indent=2) + "\n", encoding="utf-8")
-
 
 def _migrate(old_db_path: str):
     """Import memories from an existing claude_memory.db file."""
@@ -1032,10 +1136,10 @@ def _migrate(old_db_path: str):
 
     if DB_PATH.exists():
         backup = DB_PATH.with_suffix(".db.backup")
-        shutil.copy2(DB_PATH, backup)
+        _copy_db(DB_PATH, backup)
         print(f"Backed up existing DB to: {backup}")
 
-    shutil.copy2(old_path, DB_PATH)
+    _copy_db(old_path, DB_PATH)
     print(f"Migrated: {old_path} -> {DB_PATH}")
 
     db = ClaudeMemoryDB()
@@ -1044,5 +1148,26 @@ def _migrate(old_db_path: str):
           f"({stats['clear']} clear, {stats['fuzzy']} fuzzy, {stats['fading']} fading)")
 
 
+def _copy_db(src: Path, dst: Path):
+    """
+    Copy a SQLite database via the backup API.
+
+    A file copy of a WAL-mode DB misses pages not yet checkpointed into the
+    main file, and can pair the copy with a stale -wal left beside dst.
+    """
+    import sqlite3
+
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    src_conn = sqlite3.connect(src)
+    try:
+        dst_conn = sqlite3.connect(dst)
+        try:
+            src_conn.backup(dst_conn)
+        finally:
+            dst_conn.close()
+    finally:
+        src_conn.close()
+
+
 if __name__ == "__main__":
     main()
@@ -10,23 +10,96 @@ Usage:
     python -m claude_memory audit              # Run audit (last 7 days)
     python -m claude_memory audit --days 3     # Custom range
     python -m claude_memory audit --dry-run    # Show stats without calling Gemini
+    python -m claude_memory audit --projects ~/a,~/b   # Several projects, one Gemini call
 """
 
+import gzip
+import hashlib
+import importlib.util
 import json
+import mmap
 import os
+import re
+import shutil
 import sys
 import time
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from functools import partial
 from pathlib import Path
 from typing import Optional
 
-from claude_memory.memory_db import ClaudeMemoryDB
-from claude_memory.transcript_reader import list_sessions
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:  # optional — stdlib json parses the same bytes, just slower
+    _loads = json.loads
+    _dumps = lambda obj: json.dumps(obj).encode("utf-8")  # noqa: E731
+
+from claude_memory.memory_db import ClaudeMemoryDB, DB_DIR
+from claude_memory.transcript_reader import list_session_stats
 
 
 # Max chars for a single tool output or text block before truncation
 STDOUT_TRUNCATE = 2000
 
+# Session header / results banner rule
+BAR = "=" * 60
+
+# Gemini model and the input budget its 1M context leaves for the prompt
+GEMINI_MODEL = "gemini-2.5-flash"
+GEMINI_MAX_INPUT_TOKENS = 1_000_000
+# Above this len//4 estimate, ask Gemini's countTokens for the real number
+COUNT_TOKENS_ABOVE = 700_000
+
+# Consecutive identical messages up to this long collapse into one
+# "(previous repeated N×)" line when that is shorter than the repeats it
+# replaces — progress pings cost tokens and say nothing
+REPEAT_COLLAPSE_MAX_CHARS = 200
+
+# Below this many sessions, parse in-process (worker startup costs more than it saves)
+PARALLEL_MIN_SESSIONS = 4
+
+# Per-session extraction results, keyed by transcript path and validated by mtime + size
+AUDIT_CACHE_DIR = DB_DIR / "audit_cache"
+AUDIT_CACHE_MAX_AGE_DAYS = 30
+# Bump when _parse_session output changes so stale entries are re-parsed
+AUDIT_CACHE_VERSION = 1
+
+# User text starting with any of these is harness noise, not something the user typed
+_SKIP_PREFIXES_USER = ("<system-reminder>", "<local-command", "<command-name>")
+
+# "timestamp" value and entry "type" of a raw JSONL line, read without parsing
+# the JSON. The top-level keys come after the message body in transcripts, so a
+# nested "timestamp" (e.g. in a tool_use input) can match first — see _line_timestamp
+_TS_KEY = b'"timestamp":'
+_TS_BYTES_RE = re.compile(rb'"timestamp":\s*"(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d[\d.:+\-Z]*)"')
+_TYPE_BYTES_RE = re.compile(rb'"type":\s*"(\w+)"')
+# Chat entries always carry a top-level timestamp, so on these lines a lone
+# "timestamp" key is that one. Other entries (e.g. file-history-snapshot) may
+# have only a nested timestamp, so they are parsed instead
+_CHAT_TYPE_RE = re.compile(rb'"type":\s*"(?:user|assistant)"')
+
+# A user line with tool_result blocks and no text block carries no chat — and
+# tool results (file reads, command output) are the biggest lines by far
+_TOOL_RESULT_RE = re.compile(rb'"type":\s*"tool_result"')
+_TEXT_BLOCK_RE = re.compile(rb'"type":\s*"text"')
+
+# Raw-line shapes _extract_assistant_text can pull text from; a line with none of
+# these is a pure tool-call turn
+_ASSISTANT_TEXT_RE = re.compile(rb'"type":\s*"text"|"content":\s*"|"message":\s*"')
+_TOOL_USE_RE = re.compile(rb'"type":\s*"tool_use"')
+
+# User message count in an extract_chat_text session header
+_SESSION_USER_MSGS_RE = re.compile(r"^SESSION: .* — (\d+) user msgs$", re.MULTILINE)
+
+# Per-project heading Gemini is asked to use in a batch audit response
+_PROJECT_HEADING_RE = re.compile(r"^#\s*PROJECT:\s*(.+?)\s*$", re.MULTILINE)
+
+# Shared httpx.Client, created on first use (see _http_client)
+_HTTP_CLIENT = None
+
 
 def extract_chat_text(days: int = 7, project_dir: str = None) -> tuple[str, dict]:
     """
@@ -41,11 +114,15 @@ def extract_chat_text(days: int = 7, project_dir: str = None) -> tuple[str, dict
         [04:11:02] CLAUDE: Starting up. Let me run through the startup sequence...
         ...
     """
-    sessions = list_sessions(project_dir, limit=500)
+    # (path, stat) pairs from one directory walk, newest first
+    sessions = list_session_stats(project_dir, limit=500)
     if not sessions:
         return "", {"sessions": 0, "chars": 0}
 
     cutoff = time.time() - (days * 24 * 3600)
+    # Transcript timestamps are UTC ISO-8601, which sorts lexicographically
+    cutoff_iso = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(cutoff)).encode("ascii")
+    parse = partial(_parse_session, cutoff_iso=cutoff_iso)
 
     all_chat = []
     stats = {
@@ -55,60 +132,45 @@ def extract_chat_text(days: int = 7, project_dir: str = None) -> tuple[str, dict
         "skipped_tool_blocks": 0,
         "skipped_system": 0,
         "skipped_large_outputs": 0,
+        "skipped_old_bytes": 0,
         "total_raw_bytes": 0,
     }
 
+    # Newest first, so everything from the first out-of-window session on is older
+    kept = []
+    for session_path, st in sessions:
+        if st.st_mtime < cutoff:
+            break
+        stats["total_raw_bytes"] += st.st_size
+        kept.append((session_path, st))
     # Process oldest first for chronological order
-    for session_path in reversed(sessions):
-        mtime = session_path.stat().st_mtime
-        if mtime < cutoff:
-            continue
-
-        raw_size = session_path.stat().st_size
-        stats["total_raw_bytes"] += raw_size
-
-        session_lines = []
-        first_ts = None
-        last_ts = None
-        session_user_count = 0
-        session_asst_count = 0
-
-        try:
-            with open(session_path, "r", encoding="utf-8", errors="replace") as f:
-                for line in f:
-                    try:
-                        obj = json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
+    kept.reverse()
+
+    # Finished transcripts never change, so most sessions come from the cache
+    _evict_audit_cache()
+    results = [_load_cached_session(path, st, cutoff_iso) for path, st in kept]
+    misses = [i for i, result in enumerate(results) if result is None]
+    miss_paths = [kept[i][0] for i in misses]
+
+    # Parsing is CPU-bound json work per file — spread it across processes
+    # unless there are too few sessions to pay for the worker startup
+    if len(miss_paths) < PARALLEL_MIN_SESSIONS:
+        parsed = map(parse, miss_paths)
+    else:
+        with ProcessPoolExecutor() as ex:
+            parsed = list(ex.map(parse, miss_paths, chunksize=4))
 
-                    entry_type = obj.get("type", "")
-                    timestamp = obj.get("timestamp", "")
+    for i, result in zip(misses, parsed):
+        results[i] = result
+        if result is not None:
+            _store_cached_session(*kept[i], cutoff_iso, result)
 
-                    if timestamp:
-                        if not first_ts:
-                            first_ts = timestamp
-                        last_ts = timestamp
-
-                    if entry_type == "user":
-                        text = _extract_user_text(obj)
-                        if text:
-                            ts_short = _short_time(timestamp)
-                            session_lines.append(f"[{ts_short}] USER: {text}")
-                            session_user_count += 1
-                            stats["user_msgs"] += 1
-                        else:
-                            stats["skipped_system"] += 1
-
-                    elif entry_type == "assistant":
-                        text = _extract_assistant_text(obj, stats)
-                        if text:
-                            ts_short = _short_time(timestamp)
-                            session_lines.append(f"[{ts_short}] CLAUDE: {text}")
-                            session_asst_count += 1
-                            stats["assistant_msgs"] += 1
-
-        except (OSError, UnicodeDecodeError):
+    for result in results:
+        if result is None:
             continue
+        session_lines, counts, first_ts, last_ts, session_user_count = result
+        for key, value in counts.items():
+            stats[key] += value
 
         # Skip empty or near-empty sessions
         if session_user_count < 1:
@@ -121,17 +183,269 @@ def extract_chat_text(days: int = 7, project_dir: str = None) -> tuple[str, dict
         duration = _calc_duration(first_ts, last_ts)
         dur_str = f" ({duration})" if duration else ""
 
-        header = f"\n{'=' * 60}\nSESSION: {start_str}{dur_str} — {session_user_count} user msgs\n{'=' * 60}"
+        # Every piece group brings its own leading "\n" separator (none before the first header)
+        sep = "\n" if all_chat else ""
+        header = f"{sep}\n{BAR}\nSESSION: {start_str}{dur_str} — {session_user_count} user msgs\n{BAR}"
         all_chat.append(header)
         all_chat.extend(session_lines)
 
-    chat_text = "\n".join(all_chat)
+    chat_text = "".join(all_chat)
     stats["chars"] = len(chat_text)
     stats["est_tokens"] = len(chat_text) // 4
 
     return chat_text, stats
 
 
+def _parse_session(session_path: Path, cutoff_iso: bytes = b""):
+    """
+    Parse one transcript into chat lines. Top-level so worker processes can pickle it.
+
+    Lines timestamped before cutoff_iso (e.g. b"2026-02-13T04:10:41") are
+    skipped before JSON parsing — a long-lived session can reach far back.
+
+    Returns (session_lines, partial_stats, first_ts, last_ts, user_count),
+    or None if the file could not be read. session_lines is a flat list of
+    string pieces, each message starting with its own "\n[HH:MM:SS] ROLE: "
+    piece, so the caller can join everything once.
+    """
+    session_lines = []
+    counts = {
+        "user_msgs": 0,
+        "assistant_msgs": 0,
+        "skipped_tool_blocks": 0,
+        "skipped_system": 0,
+        "skipped_old_bytes": 0,
+    }
+    first_ts = None
+    last_ts = None
+    session_user_count = 0
+    run = [None, []]  # repeat tracking for _append_message
+
+    try:
+        # Map instead of read(): only the pages we touch are read in, and the
+        # bisection below means pages before the audit window never are
+        with open(session_path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:  # empty file — nothing to map
+        return session_lines, counts, first_ts, last_ts, session_user_count
+    except OSError:
+        return None
+
+    try:
+        # Jump straight to the in-window part instead of regex-testing every old line
+        pos = _window_start(data, cutoff_iso) if cutoff_iso else 0
+        counts["skipped_old_bytes"] += pos
+        end = len(data)
+
+        while pos < end:
+            nl = data.find(b"\n", pos)
+            if nl == -1:
+                nl = end
+            line = data[pos:nl]
+            pos = nl + 1
+            if not line:
+                continue
+            ts, obj = _line_timestamp(line)
+            if ts and ts < cutoff_iso:
+                counts["skipped_old_bytes"] += len(line)
+                continue
+            if _TOOL_RESULT_RE.search(line) and not _TEXT_BLOCK_RE.search(line):
+                t = _TYPE_BYTES_RE.search(line)
+                if t and t.group(1) == b"user":
+                    counts["skipped_system"] += 1
+                    if ts:
+                        if not first_ts:
+                            first_ts = ts.decode("ascii")
+                        last_ts = ts.decode("ascii")
+                    continue
+            if obj is None:
+                try:
+                    obj = _loads(line)
+                except ValueError:  # json/orjson.JSONDecodeError, bad UTF-8
+                    continue
+
+            entry_type = obj.get("type", "")
+            timestamp = obj.get("timestamp", "")
+
+            if timestamp:
+                if not first_ts:
+                    first_ts = timestamp
+                last_ts = timestamp
+
+            if entry_type == "user":
+                pieces = _extract_user_text(obj)
+                if pieces:
+                    _append_message(session_lines, run, "USER", timestamp, pieces)
+                    session_user_count += 1
+                    counts["user_msgs"] += 1
+                else:
+                    counts["skipped_system"] += 1
+
+            elif entry_type == "assistant":
+                if not _ASSISTANT_TEXT_RE.search(line):
+                    # Nothing to extract — count the tool calls without walking the content
+                    counts["skipped_tool_blocks"] += len(_TOOL_USE_RE.findall(line))
+                    continue
+                pieces = _extract_assistant_text(obj, counts)
+                if pieces:
+                    _append_message(session_lines, run, "CLAUDE", timestamp, pieces)
+                    counts["assistant_msgs"] += 1
+    finally:
+        data.close()
+
+    _flush_repeats(session_lines, run)
+    return session_lines, counts, first_ts, last_ts, session_user_count
+
+
+def _append_message(session_lines: list, run: list, role: str, timestamp: str, pieces: list):
+    """
+    Append one message's pieces, run-length collapsing consecutive short repeats.
+
+    run is [key, pending] for the previous message, updated in place; pending
+    holds the (timestamp, pieces) of repeats not yet emitted.
+    """
+    key = None
+    if sum(map(len, pieces)) <= REPEAT_COLLAPSE_MAX_CHARS:
+        # Whitespace-normalized, so "Let me check." and "Let me  check.\n" match
+        key = (role, " ".join("".join(pieces).split()))
+        if key == run[0]:
+            run[1].append((timestamp, pieces))
+            return
+    _flush_repeats(session_lines, run)
+    session_lines.append(f"\n[{_short_time(timestamp)}] {role}: ")
+    session_lines.extend(pieces)
+    run[0] = key
+
+
+def _flush_repeats(session_lines: list, run: list):
+    """Emit the pending repeats — as one "(previous repeated N×)" line only if that is shorter."""
+    pending = run[1]
+    if not pending:
+        return
+    role = run[0][0]
+    lines = [f"\n[{_short_time(ts)}] {role}: " + "".join(pieces) for ts, pieces in pending]
+    marker = f"\n[{_short_time(pending[-1][0])}] {role}: (previous repeated {len(pending)}×)"
+    if len(marker) < sum(map(len, lines)):
+        session_lines.append(marker)
+    else:
+        session_lines.extend(lines)
+    run[1] = []
+
+
+def _window_start(data: bytes, cutoff_iso: bytes) -> int:
+    """
+    Byte offset of the first transcript line at or after cutoff_iso.
+
+    Transcripts are append-only, so line timestamps only move forward and the
+    boundary can be bisected with a handful of C-level find/regex probes
+    rather than a scan over every line before it.
+    """
+    lo, hi = 0, len(data)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        line_start = data.rfind(b"\n", lo, mid) + 1 or lo
+        # Untimestamped lines go with the first timestamped line after them
+        pos, ts = line_start, None
+        while ts is None and pos < len(data):
+            nl = data.find(b"\n", pos)
+            if nl == -1:
+                nl = len(data)
+            ts = _line_timestamp(data[pos:nl])[0]
+            pos = nl + 1
+        if ts is None or ts >= cutoff_iso:
+            hi = line_start
+        else:
+            # That line is too old — the window starts after it
+            lo = min(pos, len(data))
+    return lo
+
+
+def _line_timestamp(line: bytes):
+    """
+    Top-level timestamp of one raw JSONL line, as (timestamp_bytes, parsed_obj).
+
+    The byte match is trusted only when it is the sole "timestamp" key of a
+    user/assistant line; otherwise the line is parsed and the parsed object
+    returned for reuse. Either half is None when not available — a line with
+    only nested timestamps has no top-level one.
+    """
+    n = line.count(_TS_KEY)
+    if n == 0:
+        return None, None
+    if n == 1 and _CHAT_TYPE_RE.search(line):
+        m = _TS_BYTES_RE.search(line)
+        return (m.group(1) if m else None), None
+    try:
+        obj = _loads(line)
+    except ValueError:
+        return None, None
+    ts = obj.get("timestamp") if isinstance(obj, dict) else None
+    return (ts.encode("ascii", "replace") if isinstance(ts, str) and ts else None), obj
+
+
+def _audit_cache_path(session_path: Path) -> Path:
+    return AUDIT_CACHE_DIR / (hashlib.sha1(str(session_path).encode("utf-8")).hexdigest() + ".json")
+
+
+def _load_cached_session(session_path: Path, st: os.stat_result, cutoff_iso: bytes):
+    """Cached _parse_session() result for an unchanged transcript, else None."""
+    cache_path = _audit_cache_path(session_path)
+    try:
+        entry = _loads(cache_path.read_bytes())
+    except (OSError, ValueError):
+        return None
+
+    if (entry.get("v") != AUDIT_CACHE_VERSION
+            or entry.get("mtime") != st.st_mtime or entry.get("size") != st.st_size):
+        return None
+
+    first_ts = entry["first_ts"]
+    if entry["cutoff"] != cutoff_iso.decode("ascii"):
+        # Another window gives the same result only if the cutoff dropped nothing
+        # last time and would drop nothing now
+        if entry["stats"]["skipped_old_bytes"] or (first_ts and first_ts[:19].encode("ascii") < cutoff_iso):
+            return None
+
+    try:
+        os.utime(cache_path)  # keep recently used entries clear of eviction
+    except OSError:
+        pass
+    return entry["lines"], entry["stats"], first_ts, entry["last_ts"], entry["user_count"]
+
+
+def _store_cached_session(session_path: Path, st: os.stat_result, cutoff_iso: bytes, result: tuple):
+    """Write a _parse_session() result to the audit cache (best effort)."""
+    session_lines, counts, first_ts, last_ts, user_count = result
+    entry = {
+        "v": AUDIT_CACHE_VERSION,
+        "mtime": st.st_mtime,
+        "size": st.st_size,
+        "cutoff": cutoff_iso.decode("ascii"),
+        "lines": session_lines,
+        "stats": counts,
+        "first_ts": first_ts,
+        "last_ts": last_ts,
+        "user_count": user_count,
+    }
+    try:
+        AUDIT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _audit_cache_path(session_path).write_bytes(_dumps(entry))
+    except OSError:
+        pass
+
+
+def _evict_audit_cache():
+    """Delete cache entries not used in AUDIT_CACHE_MAX_AGE_DAYS."""
+    oldest = time.time() - AUDIT_CACHE_MAX_AGE_DAYS * 24 * 3600
+    try:
+        with os.scandir(AUDIT_CACHE_DIR) as it:
+            for entry in it:
+                if entry.name.endswith(".json") and entry.stat().st_mtime < oldest:
+                    os.unlink(entry.path)
+    except OSError:
+        pass
+
+
 def run_audit(db: ClaudeMemoryDB, days: int = 7, dry_run: bool = False):
     """
     Run the weekly memory audit.
@@ -141,8 +455,7 @@ def run_audit(db: ClaudeMemoryDB, days: int = 7, dry_run: bool = False):
     3. Send both to Gemini via The Wall
     4. Print Gemini's findings
     """
-    print(f"Weekly Memory Audit — last {days} days")
-    print("=" * 50)
+    print(f"Weekly Memory Audit — last {days} days\n{'=' * 50}")
 
     # Step 1: Extract chat
     print("\n[1/3] Extracting chat text...")
@@ -152,12 +465,15 @@ def run_audit(db: ClaudeMemoryDB, days: int = 7, dry_run: bool = False):
         print("No sessions found in the last %d days." % days)
         return
 
-    print(f"  Sessions: {stats['sessions']}")
-    print(f"  User messages: {stats['user_msgs']}")
-    print(f"  Assistant messages: {stats['assistant_msgs']}")
-    print(f"  Skipped (system/tool/large): {stats['skipped_system']} / {stats['skipped_tool_blocks']} / {stats['skipped_large_outputs']}")
-    print(f"  Raw transcript size: {stats['total_raw_bytes'] / 1024 / 1024:.1f} MB")
-    print(f"  Chat text size: {stats['chars'] / 1024:.0f} KB ({stats['est_tokens']:,} est tokens)")
+    # One write per block rather than a print (lock + flush) per line
+    print(
+        f"  Sessions: {stats['sessions']}\n"
+        f"  User messages: {stats['user_msgs']}\n"
+        f"  Assistant messages: {stats['assistant_msgs']}\n"
+        f"  Skipped (system/tool/large): {stats['skipped_system']} / {stats['skipped_tool_blocks']} / {stats['skipped_large_outputs']}\n"
+        f"  Raw transcript size: {stats['total_raw_bytes'] / 1024 / 1024:.1f} MB\n"
+        f"  Chat text size: {stats['chars'] / 1024:.0f} KB ({stats['est_tokens']:,} est tokens)"
+    )
 
     # Step 2: Export memories
     print("\n[2/3] Loading current memories...")
@@ -165,18 +481,14 @@ def run_audit(db: ClaudeMemoryDB, days: int = 7, dry_run: bool = False):
     mem_stats = db.get_stats()
     mem_tokens = len(memory_text) // 4
 
-    print(f"  Memories: {mem_stats['total']}")
-    print(f"  Memory text: {len(memory_text) / 1024:.0f} KB ({mem_tokens:,} est tokens)")
-
     # Total token estimate
     total_tokens = stats["est_tokens"] + mem_tokens
-    print(f"\n  Total for Gemini: ~{total_tokens:,} tokens", end="")
-    if total_tokens > 900_000:
-        print(" — WARNING: may exceed Gemini 1M context!")
-    elif total_tokens > 700_000:
-        print(" — tight fit, should work")
-    else:
-        print(" — fits comfortably")
+
+    print(
+        f"  Memories: {mem_stats['total']}\n"
+        f"  Memory text: {len(memory_text) / 1024:.0f} KB ({mem_tokens:,} est tokens)\n"
+        f"\n  Total for Gemini: ~{total_tokens:,} tokens — {_fit_note(total_tokens)}"
+    )
 
     if dry_run:
         print("\n[DRY RUN] Skipping Gemini call. Use without --dry-run to run the audit.")
@@ -186,18 +498,17 @@ def run_audit(db: ClaudeMemoryDB, days: int = 7, dry_run: bool = False):
     print("\n[3/3] Sending to The Wall for analysis...")
 
     # Load env for API key
-    try:
-        from dotenv import load_dotenv
-        load_dotenv()
-    except ImportError:
-        pass
+    _load_dotenv()
 
     # Try project-local GeminiClient first, fall back to built-in
     client = _get_gemini_client()
 
-    prompt = _build_audit_prompt(chat_text, memory_text, days)
-    prompt_tokens = len(prompt) // 4
-    print(f"  Prompt size: {prompt_tokens:,} est tokens")
+    chats = [chat_text]
+    prompt, dropped, dropped_users = _fit_prompt(
+        client, chats, lambda chats: _build_audit_prompt(chats[0], memory_text, days), total_tokens,
+    )
+    stats["sessions"] -= dropped
+    stats["user_msgs"] -= dropped_users
     print(f"  Sending to Gemini ({client['provider']})...")
 
     response = _call_gemini(client, prompt)
@@ -217,11 +528,10 @@ def run_audit(db: ClaudeMemoryDB, days: int = 7, dry_run: bool = False):
         encoding="utf-8",
     )
     print(f"  Saved to: {audit_file}")
+    _archive_old_audits(audit_dir, keep=audit_file)
 
     # Print results (handle Windows encoding)
-    print("\n" + "=" * 60)
-    print("MEMORY AUDIT RESULTS")
-    print("=" * 60 + "\n")
+    print(f"\n{BAR}\nMEMORY AUDIT RESULTS\n{BAR}\n")
     try:
         print(response["text"])
     except UnicodeEncodeError:
@@ -230,8 +540,193 @@ def run_audit(db: ClaudeMemoryDB, days: int = 7, dry_run: bool = False):
         print(safe_text)
 
 
-def _build_audit_prompt(chat_text: str, memory_text: str, days: int) -> str:
-    """Build the prompt for Gemini memory audit."""
+def run_audit_batch(db: ClaudeMemoryDB, project_dirs: list[str], days: int = 7, dry_run: bool = False) -> dict:
+    """
+    Audit several projects against the shared memory database in one Gemini request.
+
+    Each project's chat goes into the prompt under its own "=== PROJECT: name ==="
+    marker and Gemini is asked to head its findings per project, so N projects
+    cost one call (and one connection) instead of N.
+
+    Returns {project name: findings text} (empty on dry run / no sessions).
+    """
+    print(f"Batch Memory Audit — {len(project_dirs)} projects, last {days} days\n{'=' * 50}")
+
+    print("\n[1/3] Extracting chat text...")
+    names, chats = [], []
+    for name, project_dir in zip(_project_labels(project_dirs), project_dirs):
+        chat_text, stats = extract_chat_text(days=days, project_dir=project_dir)
+        print(f"  {name}: {stats['sessions']} sessions, {stats['chars'] / 1024:.0f} KB")
+        if chat_text:
+            names.append(name)
+            chats.append(chat_text)
+
+    if not chats:
+        print("No sessions found in the last %d days." % days)
+        return {}
+
+    print("\n[2/3] Loading current memories...")
+    memory_text = db.export_text()
+    total_tokens = (sum(map(len, chats)) + len(memory_text)) // 4
+    print(f"  Total for Gemini: ~{total_tokens:,} tokens — {_fit_note(total_tokens)}")
+
+    if dry_run:
+        print("\n[DRY RUN] Skipping Gemini call. Use without --dry-run to run the audit.")
+        return {}
+
+    print("\n[3/3] Sending to The Wall for analysis...")
+    _load_dotenv()
+    client = _get_gemini_client()
+
+    def build(chats):
+        # Projects trimmed down to nothing drop out of the prompt entirely
+        sections = [(name, chat) for name, chat in zip(names, chats) if chat]
+        combined = "\n\n".join(f"=== PROJECT: {name} ===\n{chat}" for name, chat in sections)
+        return _build_audit_prompt(combined, memory_text, days, projects=[name for name, _ in sections])
+
+    prompt, _, _ = _fit_prompt(client, chats, build, total_tokens)
+    names = [name for name, chat in zip(names, chats) if chat]
+    response = _call_gemini(client, prompt)
+    print(f"  Done — {response['input_tokens']:,} input, {response['output_tokens']:,} output tokens")
+
+    audit_dir = Path.home() / ".claude-memory"
+    audit_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H%M")
+    audit_file = audit_dir / f"audit_{timestamp}_batch.md"
+    audit_file.write_text(
+        f"# Batch Memory Audit — {timestamp}\n"
+        f"*{days} days, projects: {', '.join(names)}*\n"
+        f"*Gemini: {response['input_tokens']:,} input, {response['output_tokens']:,} output tokens*\n\n"
+        f"{response['text']}",
+        encoding="utf-8",
+    )
+    print(f"  Saved to: {audit_file}")
+    _archive_old_audits(audit_dir, keep=audit_file)
+
+    results = _split_project_sections(response["text"], names)
+    for name, text in results.items():
+        print(f"\n{BAR}\nMEMORY AUDIT RESULTS — {name}\n{BAR}\n")
+        try:
+            print(text)
+        except UnicodeEncodeError:
+            # Windows terminal can't handle some Unicode chars
+            print(text.encode("ascii", errors="replace").decode("ascii"))
+    return results
+
+
+def _project_labels(project_dirs: list[str]) -> list[str]:
+    """Prompt label per project: the directory name, or the full path where names collide."""
+    names = [Path(d).name or d for d in project_dirs]
+    return [name if names.count(name) == 1 else d for name, d in zip(names, project_dirs)]
+
+
+def _fit_note(total_tokens: int) -> str:
+    """How a prompt of about total_tokens sits against Gemini's 1M context."""
+    if total_tokens > 900_000:
+        return "WARNING: may exceed Gemini 1M context!"
+    if total_tokens > 700_000:
+        return "tight fit, should work"
+    return "fits comfortably"
+
+
+def _fit_prompt(client: dict, chats: list, build_prompt, total_tokens: int) -> tuple[str, int, int]:
+    """
+    Build the prompt, dropping oldest sessions until it fits GEMINI_MAX_INPUT_TOKENS.
+
+    chats holds one chat text per project (a single entry outside batch mode)
+    and is trimmed in place, largest first; build_prompt(chats) renders it.
+    Returns (prompt, dropped_sessions, dropped_user_msgs).
+    """
+    prompt = build_prompt(chats)
+    print(f"  Prompt size: {len(prompt) // 4:,} est tokens")
+    dropped_sessions = dropped_users = 0
+
+    # The estimate is good enough unless it's near the limit — then get a real
+    # count (cheap) rather than risk a failed 1M-token generate call
+    if total_tokens <= COUNT_TOKENS_ABOVE or client["type"] != "builtin":
+        return prompt, dropped_sessions, dropped_users
+
+    counted = _count_tokens_or_estimate(client, prompt)
+    print(f"  Counted: {counted:,} tokens")
+    while counted > GEMINI_MAX_INPUT_TOKENS and any(chats):
+        # Scale the token overshoot to chars and cut at least that much
+        excess_chars = (counted - GEMINI_MAX_INPUT_TOKENS) * len(prompt) // counted + 1
+        i = max(range(len(chats)), key=lambda i: len(chats[i]))
+        chats[i], dropped, users = _drop_oldest_sessions(chats[i], excess_chars)
+        dropped_sessions += dropped
+        dropped_users += users
+        prompt = build_prompt(chats)
+        counted = _count_tokens_or_estimate(client, prompt)
+        print(f"  Dropped {dropped} oldest session(s) to fit — now {counted:,} tokens")
+    return prompt, dropped_sessions, dropped_users
+
+
+def _split_project_sections(text: str, names: list[str]) -> dict:
+    """Split a batch response on its "# PROJECT: name" headings ({"": text} if Gemini ignored them)."""
+    parts = _PROJECT_HEADING_RE.split(text)
+    if len(parts) < 3:
+        return {"": text.strip()}
+    results = {}
+    # parts = [preamble, name1, body1, name2, body2, ...]
+    for name, body in zip(parts[1::2], parts[2::2]):
+        name = name.strip()
+        results[name] = (results.get(name, "") + "\n" + body).strip()
+    return results
+
+
+def _load_dotenv():
+    """Load .env (for GOOGLE_API_KEY) if python-dotenv is installed."""
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+
+
+def _archive_old_audits(audit_dir: Path, keep: Path):
+    """
+    gzip every audit_*.md except `keep` (the newest stays plain for quick viewing).
+
+    Daily audits would otherwise pile up in ~/.claude-memory; the markdown
+    compresses several-fold. Read an archive with: gzip -dc audit_<ts>.md.gz
+    """
+    for old in audit_dir.glob("audit_*.md"):
+        if old == keep:
+            continue
+        archive = old.with_name(old.name + ".gz")
+        try:
+            with open(old, "rb") as src, gzip.open(archive, "wb", compresslevel=9) as dst:
+                shutil.copyfileobj(src, dst)
+            old.unlink()
+        except OSError:
+            pass
+
+
+def _drop_oldest_sessions(chat_text: str, excess_chars: int) -> tuple[str, int, int]:
+    """
+    Cut whole sessions off the front of chat_text until at least excess_chars are gone.
+
+    Returns (remaining_text, dropped_sessions, dropped_user_msgs).
+    """
+    header = f"{BAR}\nSESSION:"
+    cut = chat_text.find(f"\n\n{header}", excess_chars)
+    if cut == -1:
+        cut = len(chat_text)
+    dropped = chat_text[:cut]
+    dropped_users = sum(map(int, _SESSION_USER_MSGS_RE.findall(dropped)))
+    # Keep one "\n" so the text still starts like extract_chat_text's output
+    return chat_text[cut + 1:], dropped.count(header), dropped_users
+
+
+def _build_audit_prompt(chat_text: str, memory_text: str, days: int, projects: list[str] = None) -> str:
+    """Build the prompt for Gemini memory audit (projects: batch mode, see run_audit_batch)."""
+    batch_note = ""
+    if projects:
+        batch_note = f"""
+BATCH MODE: the conversations below come from {len(projects)} projects ({", ".join(projects)}),
+each starting with a "=== PROJECT: name ===" line. Audit each project separately and start
+each project's findings with a line of the form "# PROJECT: name" (exact name, own line).
+"""
     return f"""You are a MEMORY AUDITOR for a Claude Code AI assistant.
 
 This assistant has a memory system that saves important facts, decisions, and state across
@@ -271,7 +766,7 @@ At the end, provide a summary:
 - Total gaps found
 - Most critical gaps (significance >= 8)
 - Overall assessment: is the memory system capturing things well or missing a lot?
-
+{batch_note}
 === SAVED MEMORIES ({len(memory_text)} chars) ===
 
 {memory_text}
@@ -284,81 +779,108 @@ At the end, provide a summary:
 """
 
 
-def _extract_user_text(obj: dict) -> Optional[str]:
-    """Extract user message text, skipping system reminders and tool results."""
+def _extract_user_text(obj: dict) -> Optional[list[str]]:
+    """
+    Extract user message text, skipping system reminders and tool results.
+
+    Returns the text blocks with " " separator pieces between them (not joined).
+    """
     msg = obj.get("message", {})
     if isinstance(msg, str):
-        if msg.startswith("<system-reminder>") or msg.startswith("<local-command"):
+        if msg.startswith(_SKIP_PREFIXES_USER):
             return None
-        return msg.strip()
+        stripped = msg.strip()
+        return [stripped] if stripped else None
 
     if isinstance(msg, dict):
         content = msg.get("content", "")
 
         if isinstance(content, str):
-            if content.startswith("<system-reminder>") or content.startswith("<local-command"):
+            if content.startswith(_SKIP_PREFIXES_USER):
                 return None
-            return content.strip() if content.strip() else None
+            stripped = content.strip()
+            return [stripped] if stripped else None
 
         if isinstance(content, list):
             texts = []
             for block in content:
                 if isinstance(block, dict):
-                    if block.get("type") == "text":
-                        text = block.get("text", "")
-                        # Skip system reminders
-                        if text.startswith("<system-reminder>") or text.startswith("<local-command"):
-                            continue
-                        # Skip command outputs
-                        if text.startswith("<command-name>") or text.startswith("<local-command"):
-                            continue
-                        if text.strip():
-                            texts.append(text.strip())
-                    # Skip tool_result blocks entirely (these are huge)
-                    elif block.get("type") == "tool_result":
-                        pass
-            return " ".join(texts) if texts else None
+                    handler = _USER_BLOCK_HANDLERS.get(block.get("type"))
+                    if handler:
+                        handler(block, texts, None)
+            return texts or None
 
     return None
 
 
-def _extract_assistant_text(obj: dict, stats: dict) -> Optional[str]:
-    """Extract assistant text, skipping tool_use blocks."""
+def _extract_assistant_text(obj: dict, stats: dict) -> Optional[list[str]]:
+    """
+    Extract assistant text, skipping tool_use blocks.
+
+    Returns the text blocks with "\n" separator pieces between them (not joined).
+    """
     msg = obj.get("message", {})
     if isinstance(msg, str):
-        return msg.strip() if msg.strip() else None
+        stripped = msg.strip()
+        return [stripped] if stripped else None
 
     if isinstance(msg, dict):
         content = msg.get("content", "")
 
         if isinstance(content, str):
-            return content.strip() if content.strip() else None
+            stripped = content.strip()
+            return [stripped] if stripped else None
 
         if isinstance(content, list):
             texts = []
             for block in content:
                 if isinstance(block, dict):
-                    if block.get("type") == "text":
-                        text = block.get("text", "")
-                        if text.strip():
-                            texts.append(text.strip())
-                    elif block.get("type") == "tool_use":
-                        stats["skipped_tool_blocks"] += 1
-            return "\n".join(texts) if texts else None
+                    handler = _ASSISTANT_BLOCK_HANDLERS.get(block.get("type"))
+                    if handler:
+                        handler(block, texts, stats)
+            return texts or None
 
     return None
 
 
+# Content-block handlers: handler(block, texts, stats) appends to texts / bumps stats.
+# Block types missing from a table (tool_result, images, anything new) are ignored.
+
+def _user_text_block(block: dict, texts: list, stats: Optional[dict]):
+    text = block.get("text", "")
+    # Skip system reminders and command outputs
+    if text.startswith(_SKIP_PREFIXES_USER):
+        return
+    stripped = text.strip()
+    if stripped:
+        if texts:
+            texts.append(" ")
+        texts.append(stripped)
+
+
+def _assistant_text_block(block: dict, texts: list, stats: dict):
+    text = block.get("text", "")
+    stripped = text.strip()
+    if stripped:
+        if texts:
+            texts.append("\n")
+        texts.append(stripped)
+
+
+def _tool_use_block(block: dict, texts: list, stats: dict):
+    stats["skipped_tool_blocks"] += 1
+
+
+_USER_BLOCK_HANDLERS = {"text": _user_text_block}
+_ASSISTANT_BLOCK_HANDLERS = {"text": _assistant_text_block, "tool_use": _tool_use_block}
+
+
 def _short_time(timestamp: str) -> str:
     """Extract just HH:MM:SS from an ISO timestamp."""
-    if not timestamp:
-        return "??:??:??"
-    try:
-        # Handle "2026-02-20T04:10:41.123Z"
-        t = timestamp.split("T")[1] if "T" in timestamp else timestamp
-        return t[:8]  # HH:MM:SS
-    except (IndexError, TypeError):
-        return "??:??:??"
+    # "2026-02-20T04:10:41.123Z" — the time is always at the same offset
+    if timestamp and len(timestamp) >= 19:
+        return timestamp[11:19]
+    return "??:??:??"
 
 
 def _calc_duration(start: str, end: str) -> Optional[str]:
@@ -366,20 +888,41 @@ def _calc_duration(start: str, end: str) -> Optional[str]:
     if not start or not end:
         return None
     try:
-        s = datetime.fromisoformat(start.replace("Z", "+00:00"))
-        e = datetime.fromisoformat(end.replace("Z", "+00:00"))
-        mins = (e - s).total_seconds() / 60
-        if mins >= 60:
-            return f"{mins / 60:.1f}h"
-        return f"{mins:.0f} min"
-    except (ValueError, TypeError):
-        return None
+        mins = (_iso_seconds(end) - _iso_seconds(start)) / 60
+    except (ValueError, IndexError):
+        # Not the usual "...Z" transcript shape — let datetime sort it out
+        try:
+            s = datetime.fromisoformat(start.replace("Z", "+00:00"))
+            e = datetime.fromisoformat(end.replace("Z", "+00:00"))
+            mins = (e - s).total_seconds() / 60
+        except (ValueError, TypeError):
+            return None
+    if mins >= 60:
+        return f"{mins / 60:.1f}h"
+    return f"{mins:.0f} min"
+
+
+def _iso_seconds(ts: str) -> float:
+    """
+    Seconds since 0001-01-01 for a UTC "YYYY-MM-DDTHH:MM:SS[.fff]Z" timestamp.
+
+    Slices the fixed-offset fields instead of going through datetime.fromisoformat.
+    Raises ValueError/IndexError for anything else.
+    """
+    if ts[10] != "T" or ts[-1] != "Z":
+        raise ValueError(ts)
+    frac = ts[19:-1]
+    return (
+        date(int(ts[:4]), int(ts[5:7]), int(ts[8:10])).toordinal() * 86400
+        + int(ts[11:13]) * 3600 + int(ts[14:16]) * 60 + int(ts[17:19])
+        + (float(frac) if frac else 0.0)
+    )
 
 
 # ---------------------------------------------------------------------------
 # Built-in Gemini client (no external dependency on voice/gemini_client.py)
 # Requires: GOOGLE_API_KEY in env (Google AI Studio)
-# Optional: pip install httpx (falls back to urllib if missing)
+# Optional: pip install httpx (falls back to urllib if missing), httpx[http2] for HTTP/2
 # ---------------------------------------------------------------------------
 
 def _get_gemini_client() -> dict:
@@ -418,10 +961,6 @@ def _call_gemini(client: dict, prompt: str) -> dict:
         }
 
     # Built-in: direct Google AI Studio call via httpx or urllib
-    api_key = client["api_key"]
-    model = "gemini-2.5-flash"
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}"
-
     payload = {
         "contents": [{"parts": [{"text": prompt}]}],
         "generationConfig": {
@@ -430,30 +969,76 @@ def _call_gemini(client: dict, prompt: str) -> dict:
             "thinkingConfig": {"thinkingBudget": 8192},
         },
     }
+    result = _post_gemini(client, "generateContent", payload)
+
+    text = result["candidates"][0]["content"]["parts"][0]["text"]
+    usage = result.get("usageMetadata", {})
+    return {
+        "text": text,
+        "input_tokens": usage.get("promptTokenCount", 0),
+        "output_tokens": usage.get("candidatesTokenCount", 0),
+    }
+
 
+def _count_tokens(client: dict, prompt: str) -> int:
+    """Exact prompt size from Gemini's countTokens endpoint (built-in client only)."""
+    result = _post_gemini(client, "countTokens", {"contents": [{"parts": [{"text": prompt}]}]})
+    return result["totalTokens"]
+
+
+def _count_tokens_or_estimate(client: dict, prompt: str) -> int:
+    """_count_tokens(), falling back to the len//4 estimate if countTokens fails."""
     try:
+        return _count_tokens(client, prompt)
+    except Exception as e:  # optional pre-check — never let it stop the audit itself
+        print(f"  countTokens failed ({e}) — using the estimate")
+        return len(prompt) // 4
+
+
+def _http_client():
+    """
+    The shared httpx.Client, created on first use (ImportError without httpx).
+
+    countTokens + generateContent, and batch audits, then reuse one connection
+    pool instead of paying a TCP/TLS handshake per request.
+    """
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
         import httpx
-        with httpx.Client(timeout=600) as http:
-            resp = http.post(url, json=payload, headers={"Content-Type": "application/json"})
-            resp.raise_for_status()
-            result = resp.json()
+        # HTTP/2 needs the optional h2 package (pip install httpx[http2])
+        http2 = importlib.util.find_spec("h2") is not None
+        limits = httpx.Limits(max_keepalive_connections=4)
+        _HTTP_CLIENT = httpx.Client(http2=http2, timeout=600, limits=limits)
+    return _HTTP_CLIENT
+
+
+def _post_gemini(client: dict, method: str, payload: dict) -> dict:
+    """POST payload to a Gemini model method (generateContent, countTokens) via httpx or urllib."""
+    url = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:{method}?key={client['api_key']}"
+
+    # Serialize once, straight to bytes (orjson when installed) — the prompt can be
+    # several MB, so avoid an intermediate str plus a separate encode
+    body = _dumps(payload)
+
+    try:
+        http = _http_client()
     except ImportError:
+        http = None
+
+    if http is not None:
+        resp = http.post(url, content=body, headers={"Content-Type": "application/json"})
+        resp.raise_for_status()
+        result = _loads(resp.content)
+    else:
         # Fallback to urllib (no extra deps needed)
         import urllib.request
-        import json as _json
         req = urllib.request.Request(
             url,
-            data=_json.dumps(payload).encode("utf-8"),
+            data=body,
             headers={"Content-Type": "application/json"},
             method="POST",
         )
         with urllib.request.urlopen(req, timeout=600) as resp:
-            result = _json.loads(resp.read().decode("utf-8"))
+            result = _loads(resp.read())
 
-    text = result["candidates"][0]["content"]["parts"][0]["text"]
-    usage = result.get("usageMetadata", {})
-    return {
-        "text": text,
-        "input_tokens": usage.get("promptTokenCount", 0),
-        "output_tokens": usage.get("candidatesTokenCount", 0),
-    }
+    return result
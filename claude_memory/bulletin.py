@@ -8,6 +8,7 @@ Identity file: ~/.claude-memory/identity.json
 Bulletin repo: configured in identity.json (e.g. C:\\Projects\\claude-family)
 """
 
+import functools
 import json
 import subprocess
 import logging
@@ -20,8 +21,13 @@ logger = logging.getLogger(__name__)
 IDENTITY_PATH = Path.home() / ".claude-memory" / "identity.json"
 
 
+@functools.lru_cache(maxsize=1)
 def get_identity() -> Optional[dict]:
-    """Read this Claude's identity from ~/.claude-memory/identity.json."""
+    """
+    Read this Claude's identity from ~/.claude-memory/identity.json.
+
+    Cached for the life of the process — the file doesn't change mid-command.
+    """
     if not IDENTITY_PATH.exists():
         return None
     try:
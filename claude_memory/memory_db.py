@@ -57,6 +57,17 @@ PRUNE_THRESHOLD = 0.05
 # 200MB ≈ 10-15 full sessions. Mini sessions barely dent the budget.
 MAX_SESSION_STORAGE_MB = 200
 
+# Seconds to wait on a locked database (hooks can fire while a CLI command runs)
+BUSY_TIMEOUT_S = 30
+
+# Per-connection tuning. WAL itself is persistent and set once in _init_db.
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",    # WAL makes this safe; skips fsync per commit
+    "PRAGMA cache_size=-64000",     # 64MB page cache
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",   # 256MB memory-mapped reads
+)
+
 
 @dataclass
 class Memory:
@@ -103,14 +114,19 @@ class ClaudeMemoryDB:
         self._init_db()
 
     def _get_conn(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_S)
         conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
         return conn
 
     def _init_db(self):
         conn = self._get_conn()
         c = conn.cursor()
 
+        # WAL lets hook writers and CLI readers run concurrently without "database is locked"
+        c.execute("PRAGMA journal_mode=WAL")
+
         c.execute("""
             CREATE TABLE IF NOT EXISTS memories (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -293,24 +309,24 @@ class ClaudeMemoryDB:
         conn.close()
 
         # Boost recall for accessed memories
-        for mem in memories:
-            self._boost_recall(mem.id)
+        if memories:
+            self._boost_recall([mem.id for mem in memories])
 
         return memories
 
-    def _boost_recall(self, memory_id: int):
-        """Boost recall strength when a memory is accessed."""
+    def _boost_recall(self, memory_ids: list[int]):
+        """Boost recall strength when memories are accessed (one transaction for all)."""
         conn = self._get_conn()
         c = conn.cursor()
         now = datetime.now().isoformat()
 
-        c.execute("""
+        c.executemany("""
             UPDATE memories
             SET recall_strength = MIN(1.0, recall_strength + ?),
                 recalled_count = recalled_count + 1,
                 last_recalled = ?
             WHERE id = ?
-        """, (RECALL_BOOST, now, memory_id))
+        """, [(RECALL_BOOST, now, memory_id) for memory_id in memory_ids])
 
         conn.commit()
         conn.close()
@@ -372,6 +388,15 @@ class ClaudeMemoryDB:
         conn.close()
         return sessions
 
+    def count_sessions(self) -> int:
+        """Number of saved sessions."""
+        conn = self._get_conn()
+        c = conn.cursor()
+        c.execute("SELECT COUNT(*) FROM sessions")
+        count = c.fetchone()[0]
+        conn.close()
+        return count
+
     # ------------------------------------------------------------------
     # Decay / Prune
     # ------------------------------------------------------------------
@@ -497,24 +522,21 @@ class ClaudeMemoryDB:
         conn = self._get_conn()
         c = conn.cursor()
 
-        c.execute("SELECT COUNT(*) FROM memories")
-        total = c.fetchone()[0]
-
-        c.execute("SELECT COUNT(*) FROM memories WHERE recall_strength >= 0.7")
-        clear = c.fetchone()[0]
-
-        c.execute("SELECT COUNT(*) FROM memories WHERE recall_strength >= 0.4 AND recall_strength < 0.7")
-        fuzzy = c.fetchone()[0]
-
-        c.execute("SELECT COUNT(*) FROM memories WHERE recall_strength < 0.4")
-        fading = c.fetchone()[0]
+        # Counts and average in one pass over the table
+        c.execute("""
+            SELECT COUNT(*),
+                   COUNT(CASE WHEN recall_strength >= 0.7 THEN 1 END),
+                   COUNT(CASE WHEN recall_strength >= 0.4 AND recall_strength < 0.7 THEN 1 END),
+                   COUNT(CASE WHEN recall_strength < 0.4 THEN 1 END),
+                   AVG(recall_strength)
+            FROM memories
+        """)
+        total, clear, fuzzy, fading, avg_strength = c.fetchone()
+        avg_strength = avg_strength or 0
 
         c.execute("SELECT category, COUNT(*) as cnt FROM memories GROUP BY category")
         by_category = {row["category"]: row["cnt"] for row in c.fetchall()}
 
-        c.execute("SELECT AVG(recall_strength) FROM memories")
-        avg_strength = c.fetchone()[0] or 0
-
         c.execute("SELECT value FROM meta WHERE key = 'last_decay'")
         row = c.fetchone()
         last_decay = row["value"] if row else "never"
@@ -43,7 +43,9 @@ class SessionTranscript:
     file_size: int
     started_at: Optional[str] = None      # ISO timestamp
     ended_at: Optional[str] = None        # ISO timestamp
+    started_at_epoch: Optional[float] = None  # started_at as Unix time (parsed once)
     user_messages: list = field(default_factory=list)   # [{"timestamp": ..., "text": ...}]
+    first_meaningful: str = ""            # First real user prompt (not JSON/XML), first 200 chars
     files_changed: list = field(default_factory=list)   # ["/path/to/file.py", ...]
     user_message_count: int = 0
     assistant_message_count: int = 0
@@ -123,50 +125,63 @@ def find_transcript_dir(project_dir: str = None) -> Optional[Path]:
     return None
 
 
-def list_sessions(project_dir: str = None, limit: int = None, max_storage_mb: int = 200) -> list[Path]:
+def list_session_stats(
+    project_dir: str = None, limit: int = None, max_storage_mb: int = 200
+) -> list[tuple[Path, os.stat_result]]:
     """
-    List recent session transcript files, newest first.
-
-    Uses a storage cap instead of a fixed count. Mini sessions (44KB) barely
-    dent the budget while full sessions (15MB) use more, so you naturally
-    keep far more history than a fixed "last 10" count would allow.
-
-    Args:
-        project_dir: Project directory (default: cwd)
-        limit: Hard count cap (optional, for backwards compat)
-        max_storage_mb: Storage budget in MB (default: 200MB ≈ 10-15 full sessions)
+    Like list_sessions(), but returns (path, stat_result) pairs.
 
-    Returns list of Path objects to .jsonl files.
+    The directory is walked with os.scandir so each file is stat'ed exactly
+    once. Callers can filter on st_mtime / st_size and hand the stat result
+    to read_transcript() without touching the filesystem again.
     """
     transcript_dir = find_transcript_dir(project_dir)
     if not transcript_dir:
         return []
 
-    jsonl_files = sorted(
-        transcript_dir.glob("*.jsonl"),
-        key=lambda f: f.stat().st_mtime,
-        reverse=True
-    )
+    entries = []
+    with os.scandir(transcript_dir) as it:
+        for entry in it:
+            if entry.name.endswith(".jsonl") and entry.is_file():
+                entries.append((Path(entry.path), entry.stat()))
+    entries.sort(key=lambda e: e[1].st_mtime, reverse=True)
 
     # If a hard count limit is given, use it (backwards compat)
     if limit is not None:
-        return jsonl_files[:limit]
+        return entries[:limit]
 
     # Otherwise, use storage cap
     max_bytes = max_storage_mb * 1024 * 1024
     result = []
     total_bytes = 0
-    for f in jsonl_files:
-        size = f.stat().st_size
-        if total_bytes + size > max_bytes and result:
+    for path, st in entries:
+        if total_bytes + st.st_size > max_bytes and result:
             break
-        result.append(f)
-        total_bytes += size
+        result.append((path, st))
+        total_bytes += st.st_size
 
     return result
 
 
-def read_transcript(jsonl_path: Path) -> SessionTranscript:
+def list_sessions(project_dir: str = None, limit: int = None, max_storage_mb: int = 200) -> list[Path]:
+    """
+    List recent session transcript files, newest first.
+
+    Uses a storage cap instead of a fixed count. Mini sessions (44KB) barely
+    dent the budget while full sessions (15MB) use more, so you naturally
+    keep far more history than a fixed "last 10" count would allow.
+
+    Args:
+        project_dir: Project directory (default: cwd)
+        limit: Hard count cap (optional, for backwards compat)
+        max_storage_mb: Storage budget in MB (default: 200MB ≈ 10-15 full sessions)
+
+    Returns list of Path objects to .jsonl files.
+    """
+    return [path for path, _ in list_session_stats(project_dir, limit, max_storage_mb)]
+
+
+def read_transcript(jsonl_path: Path, stat: os.stat_result = None) -> SessionTranscript:
     """
     Parse a session transcript JSONL file.
 
@@ -174,9 +189,11 @@ def read_transcript(jsonl_path: Path) -> SessionTranscript:
     - User messages with timestamps
     - Files that were edited/written
     - Session start/end times
+
+    Pass the stat result from list_session_stats() to skip a redundant stat().
     """
     session_id = jsonl_path.stem
-    file_size = jsonl_path.stat().st_size
+    file_size = (stat or jsonl_path.stat()).st_size
 
     transcript = SessionTranscript(
         session_id=session_id,
@@ -216,6 +233,10 @@ def read_transcript(jsonl_path: Path) -> SessionTranscript:
                             "timestamp": timestamp,
                             "text": text,
                         })
+                        if not transcript.first_meaningful:
+                            stripped = text.strip()
+                            if stripped and not stripped.startswith(("{", "<")):
+                                transcript.first_meaningful = stripped[:200]
 
                 # Count assistant messages
                 elif entry_type == "assistant":
@@ -238,6 +259,13 @@ def read_transcript(jsonl_path: Path) -> SessionTranscript:
 
     transcript.started_at = first_timestamp
     transcript.ended_at = last_timestamp
+    if first_timestamp:
+        try:
+            transcript.started_at_epoch = datetime.fromisoformat(
+                first_timestamp.replace("Z", "+00:00")
+            ).timestamp()
+        except (ValueError, TypeError):
+            pass
 
     return transcript
 
@@ -0,0 +1,79 @@
+"""Tests for the raw-bytes timestamp prefilter in claude_memory.audit."""
+
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from claude_memory.audit import _line_timestamp, _parse_session
+
+
+def _iso(t: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(t))
+
+
+def _dump(obj: dict) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def _snapshot_line(t: float) -> bytes:
+    """A file-history-snapshot entry: no top-level timestamp, only a nested one."""
+    return _dump({
+        "type": "file-history-snapshot",
+        "messageId": "m",
+        "snapshot": {"messageId": "m", "trackedFileBackups": {}, "timestamp": _iso(t)},
+    })
+
+
+class LineTimestampTest(unittest.TestCase):
+    def test_nested_only_timestamp_is_not_top_level(self):
+        ts, _ = _line_timestamp(_snapshot_line(time.time() - 90 * 3600))
+        self.assertIsNone(ts)
+
+    def test_chat_line_uses_byte_match(self):
+        t = _iso(time.time())
+        ts, obj = _line_timestamp(_dump({"type": "user", "message": {"content": "hi"}, "timestamp": t}))
+        self.assertEqual(ts, t.encode("ascii"))
+        self.assertIsNone(obj)
+
+
+def _write_session(lines: list) -> Path:
+    f = tempfile.NamedTemporaryFile("wb", suffix=".jsonl", delete=False)
+    with f:
+        f.write(b"\n".join(lines) + b"\n")
+    return Path(f.name)
+
+
+def _user_line(t: float, text: str) -> bytes:
+    return _dump({"type": "user", "message": {"role": "user", "content": text}, "uuid": text, "timestamp": _iso(t)})
+
+
+class ParseSessionWindowTest(unittest.TestCase):
+    def _parse(self, lines: list, cutoff_hours: int):
+        path = _write_session(lines)
+        self.addCleanup(path.unlink)
+        cutoff = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(time.time() - cutoff_hours * 3600))
+        return _parse_session(path, cutoff.encode("ascii"))
+
+    def test_line_with_old_nested_timestamp_is_kept(self):
+        now = time.time()
+        lines = [_user_line(now - 3600, "a"), _snapshot_line(now - 90 * 3600), _user_line(now - 1800, "b")]
+        _, counts, _, _, user_count = self._parse(lines, 72)
+        self.assertEqual(user_count, 2)
+        self.assertEqual(counts["skipped_old_bytes"], 0)
+
+    def test_window_bisection_ignores_nested_timestamps(self):
+        # 100 hourly messages, oldest first; a 72h window keeps the last 72.
+        # Which probes land on the snapshot depends on line lengths, so try
+        # every in-window position
+        now = time.time()
+        messages = [_user_line(now - h * 3600 - 60, f"msg {h}") for h in range(99, -1, -1)]
+        for pos in range(28, 101):
+            with self.subTest(pos=pos):
+                lines = messages[:pos] + [_snapshot_line(now - 90 * 3600)] + messages[pos:]
+                _, _, _, _, user_count = self._parse(lines, 72)
+                self.assertEqual(user_count, 72)
+
+if __name__ == "__main__":
+    unittest.main()